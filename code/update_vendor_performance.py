@@ -1,48 +1,358 @@
 import argparse
-import shutil
+import functools
+import os
+import sqlite3
+import zipfile
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+
 from paceutils import Utilization
 
 u = Utilization()
 
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-262144;",
+    "PRAGMA mmap_size=2147483648;",
+]
+
+_CONNECTIONS = {}
+
+
+def get_conn():
+    """
+    Returns a SQLite connection that is reused for every query in the
+    current process, tuned for read heavy analytics (WAL journal,
+    in-memory temp store, large page cache, mmap). Connections are
+    keyed by pid so pool workers never share one with the parent.
+
+    Returns:
+        Connection: sqlite3 connection to the reporting database
+    """
+    pid = os.getpid()
+    if pid not in _CONNECTIONS:
+        conn = sqlite3.connect(u.db_filepath, detect_types=0, cached_statements=256)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        _CONNECTIONS[pid] = conn
+    return _CONNECTIONS[pid]
+
+
+def dataframe_query(query, params=None):
+    """
+    Runs a query and returns the result as a dataframe. Mirrors
+    paceutils' dataframe_query, but reuses one connection per process
+    so SQLite's page and statement caches amortize across the run
+    instead of being rebuilt for every query, and builds the frame
+    straight from the cursor rather than pd.read_sql, skipping pandas'
+    SQL inference path, which dominates for the small aggregate results
+    these queries return.
+
+    Args:
+        query: SQL query to run
+        params: parameters to bind into the query
+
+    Returns:
+        DataFrame: query results
+    """
+    cursor = get_conn().execute(query, params if params is not None else [])
+    columns = [description[0] for description in cursor.description]
+
+    return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+
+def write_csv(df, path):
+    """
+    Writes a dataframe to a csv file without the index. Uses pyarrow's
+    csv writer when it is installed, since it formats the count heavy
+    frames several times faster than pandas, and falls back to to_csv
+    otherwise.
+
+    Args:
+        df: dataframe to write
+        path: path of the csv file to write to
+    """
+    if pa is not None:
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path)
+    else:
+        df.to_csv(path, index=False)
+
+
+def month_params(start_date, end_date):
+    """
+    Creates the year-month label and the first/last day bounds for each
+    month between the start and end dates provided.
+
+    Args:
+        start_date: start date of the time period, formatted as YYYY-MM-DD
+        end_date: end date of the time period, formatted as YYYY-MM-DD
+
+    Returns:
+        list: tuples of (year-month, month start date, month end date)
+    """
+    months = []
+    for month_end in pd.date_range(start_date, end_date, freq="M"):
+        month_start = month_end.replace(day=1)
+        months.append(
+            (
+                month_end.strftime("%Y-%m"),
+                month_start.strftime("%Y-%m-%d"),
+                month_end.strftime("%Y-%m-%d"),
+            )
+        )
+
+    return months
+
+
+def months_cte(months):
+    """
+    Builds a VALUES common table expression with one row per month so
+    census style indicators can count interval overlaps for every month
+    in a single query.
+
+    Args:
+        months: list of (year-month, month start, month end) tuples
+
+    Returns:
+        tuple: CTE SQL string and the flattened parameter list
+    """
+    placeholders = ", ".join(["(?, ?, ?)"] * len(months))
+    cte = f"WITH months(ym, month_start, month_end) AS (VALUES {placeholders})"
+    cte_params = [value for month in months for value in month]
+
+    return cte, cte_params
+
+
+def spread_by_month(df, facility_col, prefix, params):
+    """
+    Pivots a long (facility, ym, cnt) dataframe into one indicator
+    column per month in the time period.
+
+    Args:
+        df: dataframe with the facility column, a ym column, and a cnt column
+        facility_col: column that contains information on facilities
+        prefix: indicator name used to label the monthly columns
+        params(tuple): start date and end date in format 'YYYY-MM-DD'
+
+    Returns:
+        DataFrame: contains rows with facilities and one indicator
+            column per month in the time period.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=[facility_col])
+
+    yms = [ym for ym, _, _ in month_params(*params)]
+    wide = pd.pivot_table(
+        df, index=facility_col, columns="ym", values="cnt", aggfunc="sum", fill_value=0
+    )
+    wide = wide.reindex(columns=yms, fill_value=0).astype("int32")
+    wide.columns = [f"{prefix}-{ym}" for ym in wide.columns]
+
+    return wide.reset_index()
+
+
+INDEXES = [
+    """CREATE INDEX IF NOT EXISTS idx_inpatient_admdate_fac
+    ON inpatient(admission_date, facility);""",
+    """CREATE INDEX IF NOT EXISTS idx_alfs_dates_fac
+    ON alfs(admission_date, discharge_date, facility_name);""",
+    """CREATE INDEX IF NOT EXISTS idx_wounds_ls_dt
+    ON wounds(living_situation, date_time_occurred, living_detail);""",
+    """CREATE INDEX IF NOT EXISTS idx_auth_svc_dates
+    ON authorizations(service_type, approval_effective_date, approval_expiration_date, vendor);""",
+]
+
+
+def ensure_indexes():
+    """
+    Creates the compound indexes used by the indicator queries so the
+    date range filters and facility group-bys become index range scans
+    instead of full table scans. Safe to run every time; the indexes are
+    only built once.
+    """
+    conn = get_conn()
+    for index in INDEXES:
+        conn.execute(index)
+    conn.commit()
+
+
+WHERE_FILTERS = {
+    "authorizations": "WHERE service_type = 'Adult Day Center Attendance'",
+    "inpatient": "WHERE admission_type IN ('Acute Hospital', 'Psych Unit / Facility')",
+}
+
+ROLLUP_TABLES = ["alfs", "nursing_home", "inpatient", "wounds"]
+
+ROLLUP_SELECTS = [
+    """SELECT 'alf_to_hosp', facility_name, strftime('%Y-%m', discharge_date), COUNT(member_id)
+    FROM alfs
+    WHERE discharge_type='Hospital/ER'
+    GROUP BY facility_name, strftime('%Y-%m', discharge_date)""",
+    """SELECT 'nf_to_hosp', facility, strftime('%Y-%m', discharge_date), COUNT(member_id)
+    FROM nursing_home
+    WHERE discharge_disposition = 'Acute care hospital or psychiatric facility'
+    GROUP BY facility, strftime('%Y-%m', discharge_date)""",
+    """SELECT 'pulcers_' || living_situation, living_detail, strftime('%Y-%m', date_time_occurred), COUNT(member_id)
+    FROM wounds
+    GROUP BY living_situation, living_detail, strftime('%Y-%m', date_time_occurred)""",
+]
+
+INPATIENT_ROLLUP_SELECT = """SELECT 'hosp_admissions', facility, {ym}, COUNT(member_id)
+    FROM inpatient
+    GROUP BY facility, {ym}"""
+
+
+def ensure_ym_column():
+    """
+    Adds a generated ym (YYYY-MM) column and covering index to the
+    inpatient table so month bucket queries are answered from the index
+    instead of computing the bucket per row. The column is VIRTUAL —
+    ALTER TABLE refuses to add a STORED column to a table that already
+    has rows — but the index materializes the computed values, which
+    gives the same lookup benefit. Generated columns need SQLite 3.31+;
+    on older versions this is skipped and callers fall back to slicing
+    admission_date.
+
+    Returns:
+        bool: whether the inpatient table has the ym column
+    """
+    conn = get_conn()
+
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(inpatient);")]
+    if "ym" not in columns:
+        try:
+            conn.execute(
+                """ALTER TABLE inpatient ADD COLUMN ym TEXT
+                GENERATED ALWAYS AS (substr(admission_date, 1, 7)) VIRTUAL;"""
+            )
+        except sqlite3.OperationalError:
+            return False
+
+    conn.execute(
+        """CREATE INDEX IF NOT EXISTS idx_inpatient_ym_fac
+        ON inpatient(ym, facility, admission_type);"""
+    )
+    conn.commit()
+    return True
+
+
+def build_rollups():
+    """
+    Creates a monthly_rollup table keyed by (indicator, facility, ym)
+    so the event based indicators read from one small precomputed table
+    instead of rescanning the raw tables.
+
+    The rollup is only rebuilt when the max rowid of an underlying table
+    changes, so repeat runs against unchanged data skip the table scans
+    entirely. The census style indicators stay on the raw tables since
+    their interval overlap counts can not be keyed by a single month.
+    """
+    conn = get_conn()
+
+    watermarks = {
+        table: conn.execute(f"SELECT MAX(rowid) FROM {table};").fetchone()[0]
+        for table in ROLLUP_TABLES
+    }
+
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS rollup_watermark
+        (source_table TEXT PRIMARY KEY, max_rowid INTEGER);"""
+    )
+    stored = dict(
+        conn.execute("SELECT source_table, max_rowid FROM rollup_watermark;")
+    )
+
+    rollup_exists = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='monthly_rollup';"
+    ).fetchone()
+
+    if rollup_exists and stored == watermarks:
+        return
+
+    ym_expr = "ym" if ensure_ym_column() else "substr(admission_date, 1, 7)"
+
+    conn.execute("DROP TABLE IF EXISTS monthly_rollup;")
+    conn.execute(
+        """CREATE TABLE monthly_rollup
+        (indicator TEXT, facility TEXT, ym TEXT, cnt INTEGER);"""
+    )
+    for select in ROLLUP_SELECTS + [INPATIENT_ROLLUP_SELECT.format(ym=ym_expr)]:
+        conn.execute(f"INSERT INTO monthly_rollup {select};")
+
+    conn.execute("DELETE FROM rollup_watermark;")
+    conn.executemany(
+        "INSERT INTO rollup_watermark VALUES (?, ?);", list(watermarks.items())
+    )
+    conn.commit()
+
+
+@functools.lru_cache(maxsize=None)
+def _distinct_facilities(table, facility_col, where_filter):
+    """
+    All facilities that appear in a table, as a tuple. Cached so the
+    indicators that share a (table, facility column) pair only pay for
+    the DISTINCT scan once per process.
+
+    Args:
+        table: SQL table in the database to pull facilities from
+        facility_col: column in SQL table that contains information on facilities
+        where_filter: WHERE clause restricting which rows are seeded
+
+    Returns:
+        tuple: distinct facility names
+    """
+    df = dataframe_query(
+        f"""SELECT DISTINCT({facility_col}) FROM {table} {where_filter};"""
+    )
+    return tuple(df[facility_col])
+
 
 def build_csv_date_spread(func, table, facility_col, start_date, end_date):
     """
-    Loops through each month between the start and end dates provided and
-    creates a dataframe with the funcs result for each month.
+    Creates a dataframe with the funcs result for each month between the
+    start and end dates provided, using a single query per indicator
+    rather than one query per month.
 
     Begins by getting all facilities that appear in the data during
     the time period.
 
     Args:
         func: python function that create a dataframe where the rows are
-            facilities and the column is the indicator values for each facility
-            during the month
+            facilities and the columns are the indicator values for each
+            month in the time period
         table: SQL table in the database that the func pulls data from
         facility_col: column in SQL table that contains information on facilities
         start_date: start date of the time period to create dataframe for
         end_date: end date of the time period to create dataframe for
 
     Returns:
-        DataFrame: contains rows with facilities and the 
+        DataFrame: contains rows with facilities and the
             indicator value for each month in the time period.
     """
-    if table == "authorizations":
-        where_filter = "WHERE service_type IS 'Adult Day Center Attendance'"
-    elif table == "inpatient":
-        where_filter = "WHERE admission_type = 'Acute Hospital' OR admission_type = 'Psych Unit / Facility'"
-    else:
-        where_filter = ""
+    where_filter = WHERE_FILTERS.get(table, "")
 
-    df = u.dataframe_query(
-        f"""SELECT DISTINCT({facility_col}) FROM {table} {where_filter};"""
-    )
+    facilities = _distinct_facilities(table, facility_col, where_filter)
+    df = pd.DataFrame({facility_col: list(facilities)})
+
+    params = (str(start_date), str(end_date))
+    if not month_params(*params):
+        df.sort_values(by=facility_col, inplace=True)
+        return df
 
-    for date in pd.date_range(start_date, end_date, freq="M"):
-        start_date = pd.to_datetime(f"{date.year}-{date.month}-01").date()
-        params = (str(start_date), str(date.date()))
+    df = df.merge(func(params), on=facility_col, how="left").fillna(0)
 
-        df = df.merge(func(params), on=facility_col, how="left").fillna(0)
+    month_cols = [col for col in df.columns if col != facility_col]
+    df[month_cols] = df[month_cols].astype("int32")
 
     df.sort_values(by=facility_col, inplace=True)
 
@@ -51,8 +361,9 @@ def build_csv_date_spread(func, table, facility_col, start_date, end_date):
 
 def build_pressure_wound_csv(facility_type, start_date, end_date):
     """
-    Loops through each month between the start and end dates provided and
-    creates a dataframe with the pressure ulcer result for each month.
+    Creates a dataframe with the pressure ulcer count for each month
+    between the start and end dates provided, using a single rollup
+    query rather than one query per month.
 
     Begins by getting all facilities that appear in the wounds data during
     the time period.
@@ -64,24 +375,36 @@ def build_pressure_wound_csv(facility_type, start_date, end_date):
         end: end date of the time period to create dataframe for
 
     Returns:
-        DataFrame: contains rows with facilities and the 
+        DataFrame: contains rows with facilities and the
             number of pressure wounds for each month in the time period.
     """
-    df = u.dataframe_query(
+    df = dataframe_query(
         """SELECT DISTINCT(living_detail) FROM wounds
-        WHERE living_situation IS ?""",
+        WHERE living_situation = ?""",
         [facility_type],
     )
     df["living_detail"].fillna("Unknown", inplace=True)
-    for date in pd.date_range(start_date, end_date, freq="M"):
-        start_date = pd.to_datetime(f"{date.year}-{date.month}-01").date()
-        params = (str(start_date), str(date.date()))
 
-        df = df.merge(
-            pressure_ulcers_at_facility(facility_type, params),
-            on="living_detail",
-            how="left",
-        ).fillna(0)
+    params = (str(start_date), str(end_date))
+    if not month_params(*params):
+        df.sort_values(by="living_detail", inplace=True)
+        return df
+
+    monthly = dataframe_query(
+        """SELECT COALESCE(facility, 'Unknown') AS living_detail, ym, cnt
+        FROM monthly_rollup
+        WHERE indicator = ?
+        AND ym BETWEEN ? AND ?;""",
+        (f"pulcers_{facility_type}", params[0][:7], params[1][:7]),
+    )
+    monthly = spread_by_month(
+        monthly, "living_detail", f"{facility_type}_pulcers", params
+    )
+
+    df = df.merge(monthly, on="living_detail", how="left").fillna(0)
+
+    month_cols = [col for col in df.columns if col != "living_detail"]
+    df[month_cols] = df[month_cols].astype("int32")
 
     df.sort_values(by="living_detail", inplace=True)
     return df
@@ -89,174 +412,223 @@ def build_pressure_wound_csv(facility_type, start_date, end_date):
 
 def alf_census_on_date(params):
     """
-    Number of ppts at each ALF during the time period.
+    Number of ppts at each ALF during each month of the time period.
 
     Args:
         params(tuple): start date and end date in format 'YYYY-MM-DD'
 
     Returns:
         DataFrame: dataframe contains the facilities and indicator value
-            for time period.    
-    """
-    return (
-        u.dataframe_query(
-            """SELECT * FROM alfs
-                            WHERE (discharge_date >= ?
-                            OR discharge_date IS NULL)
-                            AND admission_date <= ?;""",
-            params,
-        )
-        .groupby("facility_name")
-        .count()["member_id"]
-        .reset_index()
-        .rename(columns={"member_id": f"census-{params[0][:7]}"})
+            for each month in the time period.
+    """
+    cte, cte_params = months_cte(month_params(*params))
+    df = dataframe_query(
+        f"""{cte}
+        SELECT facility_name, months.ym AS ym, COUNT(member_id) AS cnt
+        FROM months JOIN alfs
+        ON (discharge_date >= month_start
+        OR discharge_date IS NULL)
+        AND admission_date <= month_end
+        GROUP BY facility_name, months.ym;""",
+        cte_params,
     )
+    return spread_by_month(df, "facility_name", "census", params)
 
 
-def alf_to_hosp(month_params):
+def alf_to_hosp(params):
     """
-    Number of ppts that discharge from an ALF to a hospital.
+    Number of ppts that discharge from an ALF to a hospital each month.
 
     Args:
         params(tuple): start date and end date in format 'YYYY-MM-DD'
 
     Returns:
         DataFrame: dataframe contains the facilities and indicator value
-            for time period.    
-    """
-    return (
-        u.dataframe_query(
-            """SELECT * FROM alfs
-            WHERE discharge_date BETWEEN ? AND ?
-            AND discharge_type='Hospital/ER';""",
-            params=month_params,
-        )
-        .groupby("facility_name")
-        .count()["member_id"]
-        .reset_index()
-        .rename(columns={"member_id": f"hosp_admits-{month_params[0]}"})
+            for each month in the time period.
+    """
+    df = dataframe_query(
+        """SELECT facility AS facility_name, ym, cnt FROM monthly_rollup
+        WHERE indicator='alf_to_hosp'
+        AND ym BETWEEN ? AND ?;""",
+        params=(params[0][:7], params[1][:7]),
     )
+    return spread_by_month(df, "facility_name", "hosp_admits", params)
 
 
 def nf_census_on_date(params):
     """
-    Number of ppts at each Nursing Facility during the time period.
+    Number of ppts at each Nursing Facility during each month of the
+    time period.
 
     Args:
         params(tuple): start date and end date in format 'YYYY-MM-DD'
 
     Returns:
         DataFrame: dataframe contains the facilities and indicator value
-            for time period.    
-    """
-    return (
-        u.dataframe_query(
-            """SELECT * FROM inpatient
-                            WHERE (discharge_date >= ?
-                            OR discharge_date IS NULL)
-                            AND admission_date <= ?;""",
-            params,
-        )
-        .groupby("facility")
-        .count()["member_id"]
-        .reset_index()
-        .rename(columns={"member_id": f"census-{params[0][:7]}"})
+            for each month in the time period.
+    """
+    cte, cte_params = months_cte(month_params(*params))
+    df = dataframe_query(
+        f"""{cte}
+        SELECT facility, months.ym AS ym, COUNT(member_id) AS cnt
+        FROM months JOIN inpatient
+        ON (discharge_date >= month_start
+        OR discharge_date IS NULL)
+        AND admission_date <= month_end
+        GROUP BY facility, months.ym;""",
+        cte_params,
     )
+    return spread_by_month(df, "facility", "census", params)
 
 
-def nf_to_hosp(month_params):
+def nf_to_hosp(params):
     """
-    Number of ppts that discharge from an nursing facility to a hospital.
+    Number of ppts that discharge from an nursing facility to a hospital
+    each month.
 
     Args:
         params(tuple): start date and end date in format 'YYYY-MM-DD'
 
     Returns:
         DataFrame: dataframe contains the facilities and indicator value
-            for time period.    
-    """
-    return (
-        u.dataframe_query(
-            """SELECT * FROM nursing_home
-            WHERE discharge_date BETWEEN ? AND ?
-            AND discharge_disposition IS 'Acute care hospital or psychiatric facility';""",
-            params=month_params,
-        )
-        .groupby("facility")
-        .count()["member_id"]
-        .reset_index()
-        .rename(columns={"member_id": f"hosp_admits-{month_params[0]}"})
+            for each month in the time period.
+    """
+    df = dataframe_query(
+        """SELECT facility, ym, cnt FROM monthly_rollup
+        WHERE indicator='nf_to_hosp'
+        AND ym BETWEEN ? AND ?;""",
+        params=(params[0][:7], params[1][:7]),
     )
+    return spread_by_month(df, "facility", "hosp_admits", params)
 
 
 def hosp_admissions(params):
     """
-    Number of admissions to each hospital during the time period.
+    Number of admissions to each hospital during each month of the
+    time period.
 
     Args:
         params(tuple): start date and end date in format 'YYYY-MM-DD'
 
     Returns:
         DataFrame: dataframe contains the facilities and indicator value
-            for time period.    
+            for each month in the time period.
+    """
+    df = dataframe_query(
+        """SELECT facility, ym, cnt FROM monthly_rollup
+        WHERE indicator='hosp_admissions'
+        AND ym BETWEEN ? AND ?;""",
+        (params[0][:7], params[1][:7]),
+    )
+    return spread_by_month(df, "facility", "admissions", params)
+
+
+def admissions_with_30day_flags(params):
+    """
+    Flags each inpatient admission in the time period as being a 30-day
+    readmit and/or resulting in one.
+
+    Pulls every acute/psych admission for the members who were admitted
+    during the period — readmits are keyed to the prior stay's discharge
+    date, so a date pad on admission_date would drop long stays and
+    readmissions falling after the period — then marks the flags in one
+    vectorized pass over the rows sorted by member and admission date,
+    comparing each admission to the previous discharge for the same
+    member. Skilled nursing stays also live in the inpatient table and
+    are excluded, since a routine hospital-to-SNF discharge is not a
+    readmission.
+
+    Args:
+        params(tuple): start date and end date in format 'YYYY-MM-DD'
+
+    Returns:
+        DataFrame: admissions in the time period with is_30day_readmit
+            and results_in_30day_readmit columns.
     """
-    return (
-        u.dataframe_query(
-            f"""SELECT * FROM inpatient
-                    WHERE admission_date BETWEEN ? AND ?;""",
-            params,
+    df = dataframe_query(
+        f"""SELECT member_id, admission_date, discharge_date, facility
+        FROM inpatient
+        {WHERE_FILTERS["inpatient"]}
+        AND member_id IN (
+            SELECT member_id FROM inpatient
+            {WHERE_FILTERS["inpatient"]}
+            AND admission_date BETWEEN ? AND ?
         )
-        .groupby("facility")
-        .count()["member_id"]
-        .reset_index()
-        .rename(columns={"member_id": f"admissions-{params[0][:7]}"})
+        ORDER BY member_id, admission_date;""",
+        params,
     )
 
+    members = df["member_id"].to_numpy()
+    admits = pd.to_datetime(df["admission_date"]).to_numpy()
+    discharges = pd.to_datetime(df["discharge_date"]).to_numpy()
+
+    gaps = (admits[1:] - discharges[:-1]).astype("timedelta64[D]").astype("int64")
+
+    readmit = np.zeros(len(df), dtype=bool)
+    readmit[1:] = (members[1:] == members[:-1]) & (gaps >= 0) & (gaps <= 30)
+
+    results_in = np.zeros(len(df), dtype=bool)
+    results_in[:-1] = readmit[1:]
+
+    df["is_30day_readmit"] = readmit
+    df["results_in_30day_readmit"] = results_in
+
+    return df[df["admission_date"].between(*params)]
+
 
 def resulting_30_day_hosp_count(params):
     """
-    Number of admissions that result in a 30-day readmit by hospital during the time period.
+    Number of admissions that result in a 30-day readmit by hospital
+    during each month of the time period.
 
     Args:
         params(tuple): start date and end date in format 'YYYY-MM-DD'
 
     Returns:
         DataFrame: dataframe contains the facilities and indicator value
-            for time period.    
+            for each month in the time period.
     """
-    return (
-        u.admissions_resulting_in_30day_df(params, "inpatient")
-        .groupby("facility")
+    df = admissions_with_30day_flags(params)
+    df = df[df["results_in_30day_readmit"]].copy()
+    df["ym"] = df["admission_date"].str[:7]
+    counts = (
+        df.groupby(["facility", "ym"])
         .count()["member_id"]
         .reset_index()
-        .rename(columns={"member_id": f"results_in_30dr-{params[0][:7]}"})
+        .rename(columns={"member_id": "cnt"})
     )
+    return spread_by_month(counts, "facility", "results_in_30dr", params)
 
 
 def readmit_30_day_hosp_count(params):
     """
-    Number of admissions that are a 30-day readmit by hospital during the time period.
+    Number of admissions that are a 30-day readmit by hospital during
+    each month of the time period.
 
     Args:
         params(tuple): start date and end date in format 'YYYY-MM-DD'
 
     Returns:
         DataFrame: dataframe contains the facilities and indicator value
-            for time period.    
+            for each month in the time period.
     """
-    return (
-        u.admissions_30day_readmit_df(params, "inpatient")
-        .groupby("facility")
+    df = admissions_with_30day_flags(params)
+    df = df[df["is_30day_readmit"]].copy()
+    df["ym"] = df["admission_date"].str[:7]
+    counts = (
+        df.groupby(["facility", "ym"])
         .count()["member_id"]
         .reset_index()
-        .rename(columns={"member_id": f"30dr-{params[0][:7]}"})
+        .rename(columns={"member_id": "cnt"})
     )
+    return spread_by_month(counts, "facility", "30dr", params)
 
 
 def infections_by_hosp(params):
     """
-    Number of infections that are acquired at a hospital by hospital during the time period.
-    
+    Number of infections that are acquired at a hospital by hospital
+    during each month of the time period.
+
     Looks for all infections that are indicated as being acquired at a hospital from
     the infections table. Then looks for any admissions within 7 days of the infection date
     and counts them per hospital.
@@ -269,117 +641,135 @@ def infections_by_hosp(params):
 
     Returns:
         DataFrame: dataframe contains the facilities and indicator value
-            for time period.    
+            for each month in the time period.
     """
-    infections = u.dataframe_query(
+    infections = dataframe_query(
         """SELECT * FROM infections
                         WHERE where_infection_was_acquired = 'Hospital'
                         AND date_time_occurred BETWEEN ? AND ?;""",
         params,
     )
-    infections_with_hosp = f"""
-                    SELECT infections.member_id, admission_date, discharge_date, facility, los, date_time_occurred
-                    FROM infections
-                    LEFT JOIN inpatient ut on infections.member_id=ut.member_id
-                    WHERE where_infection_was_acquired = 'Hospital'
-                    AND date_time_occurred BETWEEN ? AND ?;"""
-
-    df = u.dataframe_query(infections_with_hosp, params)
-
-    df["discharge_date"] = pd.to_datetime(df["discharge_date"]).dt.date
-    df["date_time_occurred"] = pd.to_datetime(df["date_time_occurred"]).dt.date
-
-    df["days_between_hosp_and_inf"] = abs(
-        df["date_time_occurred"] - df["discharge_date"]
+    hosp_within_one_weeks = dataframe_query(
+        """SELECT i.member_id, ip.facility,
+            strftime('%Y-%m', i.date_time_occurred) AS ym,
+            MIN(ABS(julianday(i.date_time_occurred) - julianday(ip.discharge_date))) AS days_between_hosp_and_inf
+        FROM infections i
+        JOIN inpatient ip ON i.member_id = ip.member_id
+        WHERE i.where_infection_was_acquired = 'Hospital'
+        AND i.date_time_occurred BETWEEN ? AND ?
+        AND ABS(julianday(i.date_time_occurred) - julianday(ip.discharge_date)) <= 7
+        GROUP BY i.member_id, i.date_time_occurred;""",
+        params,
     )
 
-    try:
-        hosp_within_one_weeks = df[
-            (df["days_between_hosp_and_inf"].dt.days <= 7)
-        ].copy()
-
-    except AttributeError:
-        return pd.DataFrame.from_dict({"facility": ["None"], "infections": ["None"]})
+    matched_members = set(hosp_within_one_weeks["member_id"].to_numpy())
+    unmatched = infections[~infections["member_id"].isin(matched_members)]
+    if not unmatched.empty:
+        write_csv(unmatched, "output/hospital_inf_without_visit.csv")
 
-    hosp_within_one_weeks.sort_values("days_between_hosp_and_inf", inplace=True)
-    hosp_within_one_weeks.drop_duplicates(
-        ["member_id", "date_time_occurred"], keep="first", inplace=True
-    )
-    infections[
-        -infections["member_id"].isin(hosp_within_one_weeks["member_id"])
-    ].to_csv("output/hospital_inf_without_visit.csv", index=False)
-    return (
-        hosp_within_one_weeks.groupby("facility")
+    counts = (
+        hosp_within_one_weeks.groupby(["facility", "ym"])
         .count()["member_id"]
         .reset_index()
-        .rename(columns={"member_id": "infections"})
+        .rename(columns={"member_id": "cnt"})
     )
+    return spread_by_month(counts, "facility", "infections", params)
 
 
 def adc_census_on_date(params):
     """
-    Number of ppts at each adult day center during the time period.
+    Number of ppts at each adult day center during each month of the
+    time period.
 
     Args:
         params(tuple): start date and end date in format 'YYYY-MM-DD'
 
     Returns:
         DataFrame: dataframe contains the facilities and indicator value
-            for time period.    
-    """
-    return (
-        u.dataframe_query(
-            """SELECT * FROM authorizations
-                WHERE service_type='Adult Day Center Attendance'
-                AND (approval_expiration_date >= ?
-                OR approval_expiration_date IS NULL)
-                AND approval_effective_date <= ?""",
-            params,
-        )
-        .groupby("vendor")
-        .count()["member_id"]
-        .reset_index()
-        .rename(columns={"member_id": f"adc_census-{params[0][:7]}"})
+            for each month in the time period.
+    """
+    cte, cte_params = months_cte(month_params(*params))
+    df = dataframe_query(
+        f"""{cte}
+        SELECT vendor, months.ym AS ym, COUNT(member_id) AS cnt
+        FROM months JOIN authorizations
+        ON service_type='Adult Day Center Attendance'
+        AND (approval_expiration_date >= month_start
+        OR approval_expiration_date IS NULL)
+        AND approval_effective_date <= month_end
+        GROUP BY vendor, months.ym;""",
+        cte_params,
     )
+    return spread_by_month(df, "vendor", "adc_census", params)
+
+
+INDICATOR_CSVS = [
+    (alf_census_on_date, "alfs", "facility_name", "output/alf_census.csv"),
+    (alf_to_hosp, "alfs", "facility_name", "output/hosp_from_alf.csv"),
+    (nf_census_on_date, "nursing_home", "facility", "output/nf_census.csv"),
+    (nf_to_hosp, "nursing_home", "facility", "output/hosp_from_nf.csv"),
+    (hosp_admissions, "inpatient", "facility", "output/hosp_admissions.csv"),
+    (
+        resulting_30_day_hosp_count,
+        "inpatient",
+        "facility",
+        "output/hosp_admit_results_in_30day.csv",
+    ),
+    (readmit_30_day_hosp_count, "inpatient", "facility", "output/hosp_30_day_readmits.csv"),
+    (infections_by_hosp, "inpatient", "facility", "output/hosp_infections.csv"),
+    (adc_census_on_date, "authorizations", "vendor", "output/adc_census.csv"),
+]
+
+PULCER_CSVS = [("SNF", "output/snf_pulcers.csv"), ("ALF", "output/alf_pulcers.csv")]
+
+
+def run_indicator(config):
+    """
+    Builds a single indicator csv. Used as the process pool task in
+    __main__; get_conn keys its cached connections by pid, so each
+    worker talks to the database on its own connection.
 
-
-def pressure_ulcers_at_facility(facility_type, params):
-    params = [facility_type] + list(params)
-    df = (
-        u.dataframe_query(
-            """SELECT * FROM wounds
-                        WHERE living_situation IS ?
-                        AND date_time_occurred BETWEEN ? AND ?""",
-            params,
-        )
-        .groupby("living_detail")
-        .count()["member_id"]
-        .reset_index()
-        .rename(columns={"member_id": f"{facility_type}_pulcers-{params[0][:7]}"})
-    )
-    df["living_detail"] = df["living_detail"].fillna("Unknown")
-    return df
+    Args:
+        config(tuple): indicator function, table, facility column,
+            output csv path, start date, and end date
+    """
+    func, table, facility_col, path, start_date, end_date = config
+    write_csv(build_csv_date_spread(func, table, facility_col, start_date, end_date), path)
 
 
-def archive_files():
+def run_pulcer(config):
     """
-    Copies output files into an archive folder.
-    Create a zip of the folder and then deleted the non-zipped folder.
+    Builds a single pressure ulcer csv. Used as the process pool task
+    in __main__.
+
+    Args:
+        config(tuple): facility type, output csv path, start date,
+            and end date
     """
-    try:
-        shutil.rmtree(f"output/{pd.datetime.today().date()}_update", ignore_errors=True)
-    except shutil.Error:
-        pass
+    facility_type, path, start_date, end_date = config
+    write_csv(build_pressure_wound_csv(facility_type, start_date, end_date), path)
 
-    shutil.copytree("output", f"output/{pd.datetime.today().date()}_update")
 
-    shutil.make_archive(
-        f"output/archive/{pd.datetime.today().date()}_update",
-        "zip",
-        f"output/{pd.datetime.today().date()}_update",
-    )
+def archive_files():
+    """
+    Zips the output files into the archive folder.
+
+    Writes the zip straight from the output folder instead of copying
+    the files first, skipping the archive folder itself so old zips are
+    not re-archived into new ones.
+    """
+    os.makedirs("output/archive", exist_ok=True)
 
-    shutil.rmtree(f"output/{pd.datetime.today().date()}_update", ignore_errors=True)
+    today = date.today()
+    with zipfile.ZipFile(
+        f"output/archive/{today}_update.zip",
+        "w",
+        zipfile.ZIP_DEFLATED,
+        compresslevel=1,
+    ) as archive:
+        for entry in os.scandir("output"):
+            if entry.is_file():
+                archive.write(entry.path, entry.name)
 
 
 if __name__ == "__main__":
@@ -399,42 +789,15 @@ if __name__ == "__main__":
 
     arguments = parser.parse_args()
 
-    build_csv_date_spread(
-        alf_census_on_date, "alfs", "facility_name", **vars(arguments)
-    ).to_csv("output/alf_census.csv", index=False)
-    build_csv_date_spread(
-        alf_to_hosp, "alfs", "facility_name", **vars(arguments)
-    ).to_csv("output/hosp_from_alf.csv", index=False)
-
-    build_csv_date_spread(
-        nf_census_on_date, "nursing_home", "facility", **vars(arguments)
-    ).to_csv("output/nf_census.csv", index=False)
-    build_csv_date_spread(
-        nf_to_hosp, "nursing_home", "facility", **vars(arguments)
-    ).to_csv("output/hosp_from_nf.csv", index=False)
-
-    build_csv_date_spread(
-        hosp_admissions, "inpatient", "facility", **vars(arguments)
-    ).to_csv("output/hosp_admissions.csv", index=False)
-    build_csv_date_spread(
-        resulting_30_day_hosp_count, "inpatient", "facility", **vars(arguments)
-    ).to_csv("output/hosp_admit_results_in_30day.csv", index=False)
-    build_csv_date_spread(
-        readmit_30_day_hosp_count, "inpatient", "facility", **vars(arguments)
-    ).to_csv("output/hosp_30_day_readmits.csv", index=False)
-    build_csv_date_spread(
-        infections_by_hosp, "inpatient", "facility", **vars(arguments)
-    ).to_csv("output/hosp_infections.csv", index=False)
-
-    build_csv_date_spread(
-        adc_census_on_date, "authorizations", "vendor", **vars(arguments)
-    ).to_csv("output/adc_census.csv", index=False)
-
-    build_pressure_wound_csv("SNF", **vars(arguments)).to_csv(
-        "output/snf_pulcers.csv", index=False
-    )
-    build_pressure_wound_csv("ALF", **vars(arguments)).to_csv(
-        "output/alf_pulcers.csv", index=False
-    )
+    ensure_indexes()
+    build_rollups()
+
+    dates = (arguments.start_date, arguments.end_date)
+    indicator_configs = [config + dates for config in INDICATOR_CSVS]
+    pulcer_configs = [config + dates for config in PULCER_CSVS]
+
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(run_indicator, indicator_configs))
+        list(executor.map(run_pulcer, pulcer_configs))
 
     archive_files()